@@ -3,14 +3,17 @@
 Export data for web visualizations.
 """
 
-import json
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+import numpy as np
+import orjson
 import pandas as pd
 
-PROJECT_ROOT = Path(__file__).parent.parent
-DATA_DIR = PROJECT_ROOT / "data"
-PREDICTIONS_DIR = DATA_DIR / "predictions"
-ADOPTION_DIR = DATA_DIR / "adoption_timing"
+# Shared helpers live in src/ at the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.agent_data import NAICS_CATS, PROJECT_ROOT, load_merged, month_bucket, month_labels
+
 OUTPUT_DIR = PROJECT_ROOT / "web"
 
 NAICS_DESCRIPTIONS = {
@@ -59,65 +62,71 @@ INDUSTRY_COLORS = {
     "21": "#2F4F4F",  # Mining - Dark Slate
 }
 
-
-def load_and_process(agent: str) -> pd.DataFrame:
-    """Load and process data for an agent."""
-    # Load files
-    first_use = pd.read_parquet(ADOPTION_DIR / f"{agent}_first_use.parquet")
-    predictions = pd.read_parquet(PREDICTIONS_DIR / f"{agent}_predictions.parquet")
-
-    # Normalize columns
-    if "repo_nwo" in first_use.columns:
-        first_use = first_use.rename(columns={"repo_nwo": "nwo"})
-    if "first_claude_commit" in first_use.columns:
-        first_use = first_use.rename(columns={"first_claude_commit": "first_use_date"})
-
-    first_use["first_use_date"] = pd.to_datetime(first_use["first_use_date"], utc=True)
-
-    # Merge
-    merged = first_use.merge(predictions[["nwo", "predicted_naics"]], on="nwo", how="inner")
-    merged["year_month"] = merged["first_use_date"].dt.to_period("M")
-
-    return merged
+# Web labels and colors indexed by categorical code
+NAICS_NAME_ARR = np.array([f"{c}: {NAICS_DESCRIPTIONS.get(c, c)}" for c in NAICS_CATS])
+NAICS_COLOR_ARR = np.array([INDUSTRY_COLORS.get(c, "#666666") for c in NAICS_CATS])
 
 
 def generate_cumulative_data(agent: str) -> dict:
     """Generate cumulative monthly data by industry."""
-    df = load_and_process(agent)
+    df = load_merged(agent)
 
     # Count by month and industry
-    monthly = df.groupby(["year_month", "predicted_naics"]).size().unstack(fill_value=0)
-    monthly = monthly.sort_index()
-
-    # Calculate cumulative
-    cumulative = monthly.cumsum()
+    year_month = month_bucket(df["first_use_date"]).rename("year_month")
+    monthly = (
+        df.groupby([year_month, df["predicted_naics"]], observed=True)
+        .size()
+        .unstack(fill_value=0)
+        .sort_index()
+    )
+
+    # One contiguous row per industry (orjson serializes these directly),
+    # accumulated along the month axis
+    monthly_values = np.ascontiguousarray(monthly.to_numpy().T)
+    cumulative_values = np.cumsum(monthly_values, axis=1)
+    final_values = cumulative_values[:, -1]
 
     # Convert to web format
-    months = [str(m) for m in cumulative.index]
+    months = month_labels(monthly.index)
 
-    industries = []
-    for col in cumulative.columns:
-        name = f"{col}: {NAICS_DESCRIPTIONS.get(col, col)}"
-        color = INDUSTRY_COLORS.get(col, "#666666")
-
-        industries.append({
-            "code": col,
-            "name": name,
-            "color": color,
-            "values": cumulative[col].tolist(),
-            "monthly": monthly[col].tolist()
-        })
+    # Look up label positions by code so the result does not depend on the
+    # category order of the frame
+    codes = list(monthly.columns)
+    positions = pd.Index(NAICS_CATS).get_indexer(codes)
+    names = NAICS_NAME_ARR[positions].tolist()
+    colors = NAICS_COLOR_ARR[positions].tolist()
 
     # Sort by final value (largest at bottom for stacking)
-    industries.sort(key=lambda x: x["values"][-1], reverse=True)
+    order = np.argsort(-final_values, kind="stable")
+
+    industries = [
+        {
+            "code": codes[i],
+            "name": names[i],
+            "color": colors[i],
+            "values": cumulative_values[i],
+            "monthly": monthly_values[i]
+        }
+        for i in order
+    ]
 
     return {
         "months": months,
         "industries": industries,
-        "total_repos": int(cumulative.iloc[-1].sum())
+        "total_repos": int(final_values.sum())
     }
 
 
+def export_agent(agent_key: str) -> dict:
+    """Generate and write the cumulative JSON for an agent."""
+    agent_data = generate_cumulative_data(agent_key)
+
+    with open(OUTPUT_DIR / f"{agent_key}_cumulative.json", "wb") as f:
+        f.write(orjson.dumps(agent_data, option=orjson.OPT_SERIALIZE_NUMPY))
+
+    return agent_data
+
+
 def main():
     OUTPUT_DIR.mkdir(exist_ok=True)
 
@@ -127,23 +136,26 @@ def main():
         ("codex", "OpenAI Codex"),
     ]
 
-    for agent_key, agent_name in agents:
-        try:
-            print(f"\n{'='*50}")
-            print(f"Processing {agent_name}...")
-            print('='*50)
-
-            agent_data = generate_cumulative_data(agent_key)
-
-            with open(OUTPUT_DIR / f"{agent_key}_cumulative.json", "w") as f:
-                json.dump(agent_data, f, indent=2)
-
-            print(f"Exported {agent_name} data: {agent_data['total_repos']:,} repos")
-            print(f"Months: {agent_data['months'][0]} to {agent_data['months'][-1]}")
-            print(f"Industries: {len(agent_data['industries'])}")
-
-        except Exception as e:
-            print(f"Error processing {agent_name}: {e}")
+    # Agents are independent and write separate files, so run them in parallel
+    with ProcessPoolExecutor(max_workers=len(agents)) as executor:
+        futures = {
+            executor.submit(export_agent, agent_key): agent_name
+            for agent_key, agent_name in agents
+        }
+        for future in as_completed(futures):
+            agent_name = futures[future]
+            try:
+                agent_data = future.result()
+
+                print(f"\n{'='*50}")
+                print(f"Processed {agent_name}")
+                print('='*50)
+                print(f"Exported {agent_name} data: {agent_data['total_repos']:,} repos")
+                print(f"Months: {agent_data['months'][0]} to {agent_data['months'][-1]}")
+                print(f"Industries: {len(agent_data['industries'])}")
+
+            except Exception as e:
+                print(f"Error processing {agent_name}: {e}")
 
     print("\n" + "="*50)
     print("All data exported to web/ directory")
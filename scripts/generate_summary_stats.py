@@ -10,9 +10,17 @@ Usage:
 """
 
 import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Dict
 
 import pandas as pd
+import pyarrow.parquet as pq
+
+# Shared helpers live in src/ at the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.agent_data import ADOPTION_DIR, PREDICTIONS_DIR, PROJECT_ROOT, load_merged, month_bucket, month_labels
 
 # Setup logging
 logging.basicConfig(
@@ -22,12 +30,14 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Paths
-PROJECT_ROOT = Path(__file__).parent.parent
-DATA_DIR = PROJECT_ROOT / "data"
-PREDICTIONS_DIR = DATA_DIR / "predictions"
-ADOPTION_DIR = DATA_DIR / "adoption_timing"
 OUTPUT_DIR = PROJECT_ROOT / "output"
 
+# Rows of each industry breakdown printed to stdout (the CSVs have all rows)
+PRINT_ROWS = 10
+
+# Agents and their display names
+AGENTS = {"claude": "Claude Code", "copilot": "GitHub Copilot", "codex": "OpenAI Codex"}
+
 # NAICS descriptions
 NAICS_DESCRIPTIONS = {
     "11": "Agriculture, Forestry, Fishing and Hunting",
@@ -53,120 +63,115 @@ NAICS_DESCRIPTIONS = {
 }
 
 
-def load_predictions(agent: str) -> pd.DataFrame:
-    """Load predictions for an agent."""
-    path = PREDICTIONS_DIR / f"{agent}_predictions.parquet"
-    logger.info(f"Loading {agent} predictions from {path}")
-    return pd.read_parquet(path)
+def available_columns(path: Path, columns: list) -> list:
+    """Return the subset of columns present in a parquet file's schema."""
+    names = pq.ParquetFile(path).schema_arrow.names
+    return [c for c in columns if c in names]
 
 
-def load_first_use(agent: str) -> pd.DataFrame:
-    """Load first use dates for an agent."""
-    path = ADOPTION_DIR / f"{agent}_first_use.parquet"
-    logger.info(f"Loading {agent} first use from {path}")
-    df = pd.read_parquet(path)
+def load_confidence(agent: str) -> pd.DataFrame:
+    """Load prediction confidence scores for an agent."""
+    path = PREDICTIONS_DIR / f"{agent}_predictions.parquet"
+    logger.info(f"Loading {agent} confidence scores from {path}")
+    return pd.read_parquet(path, columns=available_columns(path, ["confidence"]), engine="pyarrow")
 
-    # Normalize columns
-    if "repo_nwo" in df.columns:
-        df = df.rename(columns={"repo_nwo": "nwo"})
-    if "first_claude_commit" in df.columns:
-        df = df.rename(columns={"first_claude_commit": "first_use_date"})
 
-    df["first_use_date"] = pd.to_datetime(df["first_use_date"], utc=True)
-    return df
+def count_predictions(agent: str) -> int:
+    """Count repos in an agent's predictions file from the parquet footer."""
+    path = PREDICTIONS_DIR / f"{agent}_predictions.parquet"
+    return pq.ParquetFile(path).metadata.num_rows
 
 
-def generate_overview_table() -> pd.DataFrame:
-    """Generate overview table with counts per agent."""
-    agents = ["claude", "copilot", "codex"]
-    display_names = ["Claude Code", "GitHub Copilot", "OpenAI Codex"]
+def count_first_use(agent: str) -> int:
+    """Count repos in an agent's first use file from the parquet footer."""
+    path = ADOPTION_DIR / f"{agent}_first_use.parquet"
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def summarize_agent(agent: str) -> Dict[str, pd.DataFrame]:
+    """
+    Compute all summary tables for one agent in a single pass.
+
+    Returns a dict with 'overview' (one row), 'breakdown', 'monthly' and
+    'confidence' tables. 'confidence' is empty if the predictions have no
+    confidence column. A table that fails is logged and left out, so the
+    others are still reported.
+    """
+    merged = load_merged(agent)
+    summary = {}
+
+    # Industry counts, shared by the overview and the breakdown. observed=True
+    # skips unused sectors; the stable sort keeps ties in NAICS code order.
+    # Percentages are over all merged repos, including those with no industry
+    try:
+        industry_counts = (
+            merged.groupby("predicted_naics", observed=True)
+            .size()
+            .sort_values(ascending=False, kind="stable")
+        )
+        industry_pcts = industry_counts / len(merged) * 100
+
+        summary["breakdown"] = pd.DataFrame({
+            "NAICS Code": industry_counts.index,
+            "Industry": industry_counts.index.map(NAICS_DESCRIPTIONS).fillna("Unknown"),
+            "Repo Count": industry_counts.to_numpy(),
+            "Percentage": industry_pcts.map("{:.1f}%".format).to_numpy(),
+        })
+    except Exception as e:
+        logger.warning(f"Error generating breakdown for {agent}: {e}")
 
-    rows = []
-    for agent, display in zip(agents, display_names):
+    # Monthly adoption
+    try:
+        month = month_bucket(merged["first_use_date"]).rename("month")
+        monthly = merged.groupby(month).size().reset_index(name="new_repos")
+        monthly["month"] = month_labels(monthly["month"])
+        monthly["cumulative_repos"] = monthly["new_repos"].cumsum()
+        summary["monthly"] = monthly
+    except Exception as e:
+        logger.warning(f"Error generating monthly adoption for {agent}: {e}")
+
+    # The overview reuses the industry counts and months from above
+    if "breakdown" in summary and "monthly" in summary:
         try:
-            preds = load_predictions(agent)
-            first_use = load_first_use(agent)
-
-            # Merge to get date range
-            merged = first_use.merge(preds[["nwo", "predicted_naics"]], on="nwo", how="inner")
-
-            # Get top industry
-            top_industry = merged["predicted_naics"].value_counts().idxmax()
-            top_pct = merged["predicted_naics"].value_counts(normalize=True).max() * 100
-
-            rows.append({
-                "Agent": display,
-                "Repos with Predictions": len(preds),
-                "Repos with First Use": len(first_use),
+            # Months are sorted, so the date range is the first and last month
+            top_industry = industry_counts.index[0]
+            summary["overview"] = pd.DataFrame([{
+                "Agent": AGENTS[agent],
+                "Repos with Predictions": count_predictions(agent),
+                "Repos with First Use": count_first_use(agent),
                 "Merged Repos": len(merged),
-                "Date Range": f"{merged['first_use_date'].min().strftime('%Y-%m')} to {merged['first_use_date'].max().strftime('%Y-%m')}",
+                "Repos without Industry": len(merged) - industry_counts.sum(),
+                "Date Range": f"{monthly['month'].iloc[0]} to {monthly['month'].iloc[-1]}",
                 "Top Industry": f"{top_industry} ({NAICS_DESCRIPTIONS.get(top_industry, 'Unknown')[:20]}...)",
-                "Top Industry %": f"{top_pct:.1f}%"
-            })
+                "Top Industry %": f"{industry_pcts.iloc[0]:.1f}%"
+            }])
         except Exception as e:
-            logger.warning(f"Error processing {agent}: {e}")
-
-    return pd.DataFrame(rows)
-
-
-def generate_industry_breakdown(agent: str) -> pd.DataFrame:
-    """Generate industry breakdown for a single agent."""
-    preds = load_predictions(agent)
-    first_use = load_first_use(agent)
-
-    merged = first_use.merge(preds[["nwo", "predicted_naics"]], on="nwo", how="inner")
-
-    # Count by industry
-    industry_counts = merged["predicted_naics"].value_counts()
-    industry_pcts = merged["predicted_naics"].value_counts(normalize=True) * 100
-
-    rows = []
-    for naics in industry_counts.index:
-        rows.append({
-            "NAICS Code": naics,
-            "Industry": NAICS_DESCRIPTIONS.get(naics, "Unknown"),
-            "Repo Count": industry_counts[naics],
-            "Percentage": f"{industry_pcts[naics]:.1f}%"
-        })
-
-    return pd.DataFrame(rows)
-
-
-def generate_monthly_adoption(agent: str) -> pd.DataFrame:
-    """Generate monthly adoption counts for an agent."""
-    preds = load_predictions(agent)
-    first_use = load_first_use(agent)
-
-    merged = first_use.merge(preds[["nwo", "predicted_naics"]], on="nwo", how="inner")
-    merged["month"] = merged["first_use_date"].dt.to_period("M")
-
-    monthly = merged.groupby("month").size().reset_index(name="new_repos")
-    monthly["month"] = monthly["month"].astype(str)
-    monthly["cumulative_repos"] = monthly["new_repos"].cumsum()
-
-    return monthly
-
-
-def generate_confidence_stats(agent: str) -> pd.DataFrame:
-    """Generate confidence score statistics."""
-    preds = load_predictions(agent)
-
-    if "confidence" not in preds.columns:
-        logger.warning(f"No confidence column in {agent} predictions")
-        return pd.DataFrame()
-
-    stats = {
-        "Mean Confidence": preds["confidence"].mean(),
-        "Median Confidence": preds["confidence"].median(),
-        "Std Confidence": preds["confidence"].std(),
-        "Min Confidence": preds["confidence"].min(),
-        "Max Confidence": preds["confidence"].max(),
-        "Repos > 0.9 conf": (preds["confidence"] > 0.9).sum(),
-        "Repos > 0.8 conf": (preds["confidence"] > 0.8).sum(),
-        "Repos > 0.7 conf": (preds["confidence"] > 0.7).sum(),
-    }
-
-    return pd.DataFrame([stats])
+            logger.warning(f"Error generating overview for {agent}: {e}")
+    else:
+        logger.warning(f"Skipping overview for {agent}: breakdown or monthly table failed")
+
+    try:
+        conf = load_confidence(agent)
+        if "confidence" in conf.columns:
+            scores = conf["confidence"]
+            agg = scores.agg(["mean", "median", "std", "min", "max"])
+            summary["confidence"] = pd.DataFrame([{
+                "Mean Confidence": agg["mean"],
+                "Median Confidence": agg["median"],
+                "Std Confidence": agg["std"],
+                "Min Confidence": agg["min"],
+                "Max Confidence": agg["max"],
+                "Repos > 0.9 conf": (scores > 0.9).sum(),
+                "Repos > 0.8 conf": (scores > 0.8).sum(),
+                "Repos > 0.7 conf": (scores > 0.7).sum(),
+            }])
+        else:
+            logger.warning(f"No confidence column in {agent} predictions")
+            summary["confidence"] = pd.DataFrame()
+    except Exception as e:
+        logger.warning(f"Error generating confidence stats for {agent}: {e}")
+
+    return summary
 
 
 def main():
@@ -176,53 +181,62 @@ def main():
     # Ensure output directory exists
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+    # Agents are independent, so summarize them in parallel
+    results = {}
+    with ProcessPoolExecutor(max_workers=len(AGENTS)) as executor:
+        futures = {executor.submit(summarize_agent, agent): agent for agent in AGENTS}
+        for future in as_completed(futures):
+            agent = futures[future]
+            try:
+                results[agent] = future.result()
+            except Exception as e:
+                logger.warning(f"Error processing {agent}: {e}")
+
+    # Report in the usual agent order regardless of completion order
+    summaries = {agent: results[agent] for agent in AGENTS if agent in results}
+
     # Overview table
     logger.info("\n" + "="*60)
     logger.info("OVERVIEW TABLE")
     logger.info("="*60)
-    overview = generate_overview_table()
+    overview_rows = [summary["overview"] for summary in summaries.values() if "overview" in summary]
+    overview = pd.concat(overview_rows, ignore_index=True) if overview_rows else pd.DataFrame()
     print(overview.to_string(index=False))
     overview.to_csv(OUTPUT_DIR / "overview.csv", index=False)
 
     # Industry breakdown per agent
-    agents = ["claude", "copilot", "codex"]
-    display_names = {"claude": "Claude Code", "copilot": "GitHub Copilot", "codex": "OpenAI Codex"}
-
-    for agent in agents:
-        try:
-            logger.info(f"\n{'='*60}")
-            logger.info(f"INDUSTRY BREAKDOWN - {display_names[agent]}")
-            logger.info("="*60)
-            breakdown = generate_industry_breakdown(agent)
-            print(breakdown.to_string(index=False))
-            breakdown.to_csv(OUTPUT_DIR / f"industry_breakdown_{agent}.csv", index=False)
-        except Exception as e:
-            logger.warning(f"Error generating breakdown for {agent}: {e}")
+    for agent, summary in summaries.items():
+        if "breakdown" not in summary:
+            continue
+        logger.info(f"\n{'='*60}")
+        logger.info(f"INDUSTRY BREAKDOWN - {AGENTS[agent]}")
+        logger.info("="*60)
+        breakdown = summary["breakdown"]
+        print(breakdown.head(PRINT_ROWS).to_string(index=False))
+        if len(breakdown) > PRINT_ROWS:
+            print(f"... ({len(breakdown) - PRINT_ROWS} more rows)")
+        breakdown.to_csv(OUTPUT_DIR / f"industry_breakdown_{agent}.csv", index=False)
 
     # Monthly adoption
-    for agent in agents:
-        try:
-            logger.info(f"\n{'='*60}")
-            logger.info(f"MONTHLY ADOPTION - {display_names[agent]}")
-            logger.info("="*60)
-            monthly = generate_monthly_adoption(agent)
-            print(monthly.tail(12).to_string(index=False))
-            monthly.to_csv(OUTPUT_DIR / f"monthly_adoption_{agent}.csv", index=False)
-        except Exception as e:
-            logger.warning(f"Error generating monthly adoption for {agent}: {e}")
+    for agent, summary in summaries.items():
+        if "monthly" not in summary:
+            continue
+        logger.info(f"\n{'='*60}")
+        logger.info(f"MONTHLY ADOPTION - {AGENTS[agent]}")
+        logger.info("="*60)
+        monthly = summary["monthly"]
+        print(monthly.tail(12).to_string(index=False))
+        monthly.to_csv(OUTPUT_DIR / f"monthly_adoption_{agent}.csv", index=False)
 
     # Confidence statistics
-    for agent in agents:
-        try:
-            conf_stats = generate_confidence_stats(agent)
-            if not conf_stats.empty:
-                logger.info(f"\n{'='*60}")
-                logger.info(f"CONFIDENCE STATS - {display_names[agent]}")
-                logger.info("="*60)
-                print(conf_stats.to_string(index=False))
-                conf_stats.to_csv(OUTPUT_DIR / f"confidence_stats_{agent}.csv", index=False)
-        except Exception as e:
-            logger.warning(f"Error generating confidence stats for {agent}: {e}")
+    for agent, summary in summaries.items():
+        conf_stats = summary.get("confidence", pd.DataFrame())
+        if not conf_stats.empty:
+            logger.info(f"\n{'='*60}")
+            logger.info(f"CONFIDENCE STATS - {AGENTS[agent]}")
+            logger.info("="*60)
+            print(conf_stats.to_string(index=False))
+            conf_stats.to_csv(OUTPUT_DIR / f"confidence_stats_{agent}.csv", index=False)
 
     logger.info(f"\nAll statistics saved to {OUTPUT_DIR}/")
 
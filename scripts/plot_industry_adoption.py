@@ -10,11 +10,19 @@ Usage:
 """
 
 import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Dict
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
+# Shared helpers live in src/ at the project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.agent_data import PROJECT_ROOT, load_merged, month_bucket, month_labels
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,10 +31,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Paths
-PROJECT_ROOT = Path(__file__).parent.parent
-DATA_DIR = PROJECT_ROOT / "data"
-PREDICTIONS_DIR = DATA_DIR / "predictions"
-ADOPTION_DIR = DATA_DIR / "adoption_timing"
 FIGURES_DIR = PROJECT_ROOT / "figures"
 
 # NAICS code descriptions for chart legends
@@ -43,6 +47,7 @@ NAICS_DESCRIPTIONS = {
     "52": "Finance",
     "53": "Real Estate",
     "54": "Professional Services",
+    "55": "Management",
     "56": "Admin Services",
     "61": "Education",
     "62": "Healthcare",
@@ -53,57 +58,6 @@ NAICS_DESCRIPTIONS = {
 }
 
 
-def load_first_use(agent: str) -> pd.DataFrame:
-    """
-    Load first use dates for an agent.
-
-    Args:
-        agent: Agent name ('claude', 'copilot', or 'codex')
-
-    Returns:
-        DataFrame with columns ['nwo', 'first_use_date']
-    """
-    path = ADOPTION_DIR / f"{agent}_first_use.parquet"
-    logger.info(f"Loading {agent} first use dates from {path}")
-
-    df = pd.read_parquet(path)
-
-    # Normalize column names
-    if "repo_nwo" in df.columns:
-        df = df.rename(columns={"repo_nwo": "nwo"})
-    if "first_claude_commit" in df.columns:
-        df = df.rename(columns={"first_claude_commit": "first_use_date"})
-
-    df["first_use_date"] = pd.to_datetime(df["first_use_date"], utc=True)
-
-    logger.info(f"Loaded {len(df)} {agent} repos")
-    return df
-
-
-def merge_with_predictions(first_use: pd.DataFrame, predictions_path: Path) -> pd.DataFrame:
-    """
-    Merge first use dates with predictions to get industry classification.
-
-    Args:
-        first_use: DataFrame with columns ['nwo', 'first_use_date']
-        predictions_path: Path to predictions parquet file
-
-    Returns:
-        Merged DataFrame with industry classifications
-    """
-    logger.info(f"Loading predictions from {predictions_path}")
-    predictions = pd.read_parquet(predictions_path)
-
-    # Keep only necessary columns
-    predictions = predictions[["nwo", "predicted_naics"]].copy()
-
-    # Merge
-    merged = first_use.merge(predictions, on="nwo", how="inner")
-    logger.info(f"Merged {len(merged)} repos with industry classifications")
-
-    return merged
-
-
 def aggregate_by_month_industry(df: pd.DataFrame) -> pd.DataFrame:
     """
     Aggregate data by month and industry.
@@ -114,62 +68,64 @@ def aggregate_by_month_industry(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         Pivot table with months as index and industries as columns
     """
-    # Extract year-month
-    df = df.copy()
-    df["year_month"] = df["first_use_date"].dt.to_period("M")
+    # Integer year-month key as a standalone Series (no copy of df needed)
+    year_month = month_bucket(df["first_use_date"]).rename("year_month")
 
     # Count repos per industry per month
-    monthly = df.groupby(["year_month", "predicted_naics"]).size().unstack(fill_value=0)
+    monthly = (
+        df.groupby([year_month, df["predicted_naics"]], observed=True)
+        .size()
+        .unstack(fill_value=0)
+    )
 
-    # Sort by date
+    # Sort by date, then label the (few) months as periods for plotting
     monthly = monthly.sort_index()
+    monthly.index = pd.PeriodIndex(month_labels(monthly.index), freq="M", name="year_month")
 
     return monthly
 
 
-def plot_stacked_area(
+def draw_stacked_area(
+    ax: plt.Axes,
     data: pd.DataFrame,
     title: str,
-    output_path: Path,
     top_n: int = 10
 ):
     """
-    Create a stacked area chart of monthly adoption by industry.
+    Draw a stacked area chart of monthly adoption by industry onto an axes.
 
     Args:
+        ax: Axes to draw on
         data: Pivot table with months as index and industries as columns
         title: Chart title
-        output_path: Path to save the chart
         top_n: Number of top industries to show (rest grouped as "Other")
     """
-    # Get top N industries by total count
-    industry_totals = data.sum().sort_values(ascending=False)
-    top_industries = industry_totals.head(top_n).index.tolist()
+    # Get top N industries by total count (argpartition avoids a full sort)
+    totals = data.to_numpy().sum(axis=0)
+    if len(totals) > top_n:
+        top_idx = np.argpartition(-totals, top_n)[:top_n]
+    else:
+        top_idx = np.arange(len(totals))
+    top_idx = top_idx[np.argsort(-totals[top_idx], kind="stable")]
+    top_industries = data.columns[top_idx]
 
     # Group remaining industries as "Other"
-    plot_data = data[top_industries].copy()
-    other_cols = [c for c in data.columns if c not in top_industries]
-    if other_cols:
-        plot_data["Other"] = data[other_cols].sum(axis=1)
-
-    # Convert period index to datetime for plotting
-    plot_data.index = plot_data.index.to_timestamp()
+    plot_data = data[top_industries]
+    other_mask = ~data.columns.isin(top_industries)
+    if other_mask.any():
+        plot_data = plot_data.assign(Other=data.iloc[:, other_mask.nonzero()[0]].sum(axis=1))
 
     # Create labels with descriptions
-    columns_with_desc = []
-    for col in plot_data.columns:
-        if col == "Other":
-            columns_with_desc.append("Other")
-        else:
-            desc = NAICS_DESCRIPTIONS.get(col, col)
-            columns_with_desc.append(f"{col}: {desc}")
-
-    # Create figure
-    fig, ax = plt.subplots(figsize=(14, 8))
+    columns_with_desc = [
+        col if col == "Other" else f"{col}: {NAICS_DESCRIPTIONS.get(col, col)}"
+        for col in plot_data.columns
+    ]
 
-    # Plot stacked area
-    plot_data.columns = columns_with_desc
-    plot_data.plot.area(ax=ax, stacked=True, alpha=0.8)
+    # Plot stacked area in one call: datetime x, one row per industry
+    x = plot_data.index.to_timestamp().to_numpy()
+    y = plot_data.to_numpy().T
+    ax.stackplot(x, y, labels=columns_with_desc, alpha=0.8)
+    ax.set_xlim(x[0], x[-1])
 
     # Formatting
     ax.set_title(title, fontsize=14, fontweight="bold")
@@ -179,13 +135,49 @@ def plot_stacked_area(
     ax.grid(axis="y", alpha=0.3)
 
     # Rotate x-axis labels
-    plt.xticks(rotation=45, ha="right")
-    plt.tight_layout()
+    plt.setp(ax.get_xticklabels(), rotation=45, ha="right")
+
 
-    # Save
-    plt.savefig(output_path, dpi=150, bbox_inches="tight")
+def save_axes(fig: plt.Figure, ax: plt.Axes, output_path: Path, pad: float = 0.1):
+    """
+    Save a single subplot of a figure by cropping to its tight bounding box.
+
+    Args:
+        fig: Figure containing the axes (already laid out)
+        ax: Axes to save
+        output_path: Path to save the chart
+        pad: Padding around the axes in inches
+    """
+    bbox = ax.get_tightbbox(fig.canvas.get_renderer())
+    bbox = bbox.transformed(fig.dpi_scale_trans.inverted()).padded(pad)
+    fig.savefig(output_path, dpi=150, bbox_inches=bbox)
     logger.info(f"Saved chart to {output_path}")
-    plt.close()
+
+
+def plot_agents(monthly_by_agent: Dict[str, pd.DataFrame], agent_names: Dict[str, str]):
+    """
+    Draw every agent's chart into one figure and save it plus per-agent crops.
+
+    Args:
+        monthly_by_agent: Monthly pivot tables keyed by agent key
+        agent_names: Display names keyed by agent key
+    """
+    # One figure for all agents so matplotlib is only set up once
+    fig, axes = plt.subplots(
+        1, len(monthly_by_agent), figsize=(14 * len(monthly_by_agent), 8), squeeze=False
+    )
+    for ax, (agent_key, monthly) in zip(axes[0], monthly_by_agent.items()):
+        draw_stacked_area(ax, monthly, f"Monthly Industry Adoption - {agent_names[agent_key]}")
+    fig.tight_layout()
+
+    # Per-agent charts are crops of the shared figure
+    for ax, agent_key in zip(axes[0], monthly_by_agent):
+        save_axes(fig, ax, FIGURES_DIR / f"industry_adoption_{agent_key}.png")
+
+    output_path = FIGURES_DIR / "industry_adoption_all.png"
+    fig.savefig(output_path, dpi=150, bbox_inches="tight")
+    logger.info(f"Saved chart to {output_path}")
+    plt.close(fig)
 
 
 def process_agent(
@@ -193,22 +185,21 @@ def process_agent(
     agent_key: str,
 ):
     """
-    Process a single agent: load data, merge with predictions, and create chart.
+    Process a single agent: load data, merge with predictions, and aggregate.
 
     Args:
-        agent_name: Display name of the agent (for chart title)
+        agent_name: Display name of the agent (for log output)
         agent_key: Key for file names ('claude', 'copilot', or 'codex')
+
+    Returns:
+        Monthly pivot table with months as index and industries as columns
     """
     logger.info(f"\n{'='*50}")
     logger.info(f"Processing {agent_name}")
     logger.info(f"{'='*50}")
 
-    # Load first use data
-    first_use_df = load_first_use(agent_key)
-
-    # Merge with predictions
-    predictions_path = PREDICTIONS_DIR / f"{agent_key}_predictions.parquet"
-    merged = merge_with_predictions(first_use_df, predictions_path)
+    # Load and merge with predictions (reused from data/_cache/ when fresh)
+    merged = load_merged(agent_key)
 
     # Aggregate by month and industry
     monthly = aggregate_by_month_industry(merged)
@@ -221,15 +212,7 @@ def process_agent(
         desc = NAICS_DESCRIPTIONS.get(naics, "Unknown")
         logger.info(f"  {naics} ({desc}): {count}")
 
-    # Create visualization
-    output_path = FIGURES_DIR / f"industry_adoption_{agent_key}.png"
-    plot_stacked_area(
-        monthly,
-        f"Monthly Industry Adoption - {agent_name}",
-        output_path
-    )
-
-    return merged
+    return monthly
 
 
 def main():
@@ -246,11 +229,26 @@ def main():
         ("OpenAI Codex", "codex"),
     ]
 
-    for agent_name, agent_key in agents:
-        try:
-            process_agent(agent_name, agent_key)
-        except FileNotFoundError as e:
-            logger.warning(f"Data not found for {agent_name}: {e}")
+    # Data preparation is independent per agent, so run it in parallel
+    results = {}
+    with ProcessPoolExecutor(max_workers=len(agents)) as executor:
+        futures = {
+            executor.submit(process_agent, agent_name, agent_key): agent_name
+            for agent_name, agent_key in agents
+        }
+        for future in as_completed(futures):
+            agent_name = futures[future]
+            try:
+                results[agent_name] = future.result()
+            except FileNotFoundError as e:
+                logger.warning(f"Data not found for {agent_name}: {e}")
+
+    # Create visualizations in the usual agent order
+    monthly_by_agent = {
+        agent_key: results[agent_name] for agent_name, agent_key in agents if agent_name in results
+    }
+    if monthly_by_agent:
+        plot_agents(monthly_by_agent, {agent_key: agent_name for agent_name, agent_key in agents})
 
     logger.info("\nDone! Check figures/ for output files.")
 
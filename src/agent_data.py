@@ -0,0 +1,251 @@
+"""
+Shared Loading Helpers for AI Agent Adoption Data.
+
+This module holds the pieces the analysis scripts have in common: reading
+the first use and prediction parquet files, normalizing their columns and
+dtypes, merging them (with an on-disk cache), and bucketing first use dates
+by month.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from src.naics_mapping import NAICS_SECTORS
+
+logger = logging.getLogger(__name__)
+
+# Paths
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
+PREDICTIONS_DIR = DATA_DIR / "predictions"
+ADOPTION_DIR = DATA_DIR / "adoption_timing"
+CACHE_DIR = DATA_DIR / "_cache"
+
+# First use column names; older exports use repo_nwo / first_claude_commit
+FIRST_USE_NWO_COLUMNS = ["nwo", "repo_nwo"]
+FIRST_USE_DATE_COLUMNS = ["first_use_date", "first_claude_commit"]
+
+# Layout of the merged frame. Bump MERGE_CACHE_VERSION whenever merge_agent()
+# changes what it returns, so stale caches are not picked up.
+MERGED_COLUMNS = ["nwo", "first_use_date", "predicted_naics"]
+MERGE_CACHE_VERSION = 2
+
+# Fixed NAICS sector categories, so grouping and counting work on integer codes.
+# Codes outside NAICS_SECTORS are kept under UNKNOWN_NAICS rather than dropped.
+UNKNOWN_NAICS = "Unknown"
+NAICS_CATS = list(NAICS_SECTORS) + [UNKNOWN_NAICS]
+NAICS_DTYPE = pd.CategoricalDtype(categories=NAICS_CATS)
+
+
+def to_utc_datetime(s: pd.Series) -> pd.Series:
+    """
+    Convert a date column to UTC timestamps.
+
+    Parquet usually stores these as timestamps already, so parsing is only
+    done for non-datetime columns.
+
+    Args:
+        s: Date column (tz-aware, naive, or string)
+
+    Returns:
+        Series with dtype datetime64[..., UTC]
+    """
+    if isinstance(s.dtype, pd.DatetimeTZDtype):
+        return s if str(s.dt.tz) == "UTC" else s.dt.tz_convert("UTC")
+    if pd.api.types.is_datetime64_dtype(s):
+        return s.dt.tz_localize("UTC")
+    return pd.to_datetime(s, utc=True)
+
+
+def to_naics_category(codes: pd.Series) -> pd.Series:
+    """
+    Cast NAICS codes to the fixed categorical dtype.
+
+    Args:
+        codes: Series of NAICS code strings
+
+    Returns:
+        Categorical Series of NAICS_DTYPE; codes outside NAICS_SECTORS become
+        UNKNOWN_NAICS and missing codes stay NaN
+    """
+    # Report unmapped codes
+    unmapped = codes.notna() & ~codes.isin(list(NAICS_SECTORS))
+    if unmapped.any():
+        logger.warning(
+            f"{unmapped.sum()} repos have unmapped NAICS codes: "
+            f"{sorted(codes[unmapped].unique().tolist())}"
+        )
+
+    return codes.mask(unmapped, UNKNOWN_NAICS).astype(NAICS_DTYPE)
+
+
+def month_bucket(dates: pd.Series) -> pd.Series:
+    """
+    Compute an integer month key for grouping timestamps by month.
+
+    Grouping on machine ints is much cheaper than on Period objects.
+
+    Args:
+        dates: Datetime Series
+
+    Returns:
+        int32 Series of year * 12 + month - 1
+    """
+    return (dates.dt.year * 12 + dates.dt.month - 1).astype("int32")
+
+
+def month_labels(buckets) -> list:
+    """
+    Format month keys from month_bucket() as strings.
+
+    Args:
+        buckets: Iterable of integer month keys
+
+    Returns:
+        List of 'YYYY-MM' strings
+    """
+    return [f"{b // 12}-{b % 12 + 1:02d}" for b in buckets]
+
+
+def load_predictions(agent: str) -> pd.DataFrame:
+    """
+    Load industry predictions for an agent.
+
+    Args:
+        agent: Agent name ('claude', 'copilot', or 'codex')
+
+    Returns:
+        DataFrame with columns ['nwo', 'predicted_naics'] ('predicted_naics'
+        is categorical)
+    """
+    path = PREDICTIONS_DIR / f"{agent}_predictions.parquet"
+    logger.info(f"Loading {agent} predictions from {path}")
+    # Read only the columns needed for the merge
+    df = pd.read_parquet(path, columns=["nwo", "predicted_naics"], engine="pyarrow")
+
+    # Arrow strings hash faster in the merge; categorical codes speed up grouping
+    df["nwo"] = df["nwo"].astype("string[pyarrow]")
+    df["predicted_naics"] = to_naics_category(df["predicted_naics"])
+    return df
+
+
+def load_first_use(agent: str, nwos: Optional[pd.Series] = None) -> pd.DataFrame:
+    """
+    Load first use dates for an agent.
+
+    The repo filter is pushed down to the parquet reader so row groups that
+    cannot match are skipped.
+
+    Args:
+        agent: Agent name ('claude', 'copilot', or 'codex')
+        nwos: Only load these repos (None loads all)
+
+    Returns:
+        DataFrame with columns ['nwo', 'first_use_date']
+    """
+    path = ADOPTION_DIR / f"{agent}_first_use.parquet"
+    logger.info(f"Loading {agent} first use dates from {path}")
+
+    dataset = ds.dataset(path, format="parquet")
+    names = dataset.schema.names
+    nwo_col = next(c for c in FIRST_USE_NWO_COLUMNS if c in names)
+    date_col = next(c for c in FIRST_USE_DATE_COLUMNS if c in names)
+
+    table = dataset.to_table(
+        columns=[nwo_col, date_col],
+        filter=None if nwos is None else ds.field(nwo_col).isin(pa.array(nwos)),
+    )
+
+    # Normalize column names
+    df = table.to_pandas().rename(columns={nwo_col: "nwo", date_col: "first_use_date"})
+
+    df["nwo"] = df["nwo"].astype("string[pyarrow]")
+    df["first_use_date"] = to_utc_datetime(df["first_use_date"])
+
+    logger.info(f"Loaded {len(df)} {agent} repos")
+    return df
+
+
+def merge_agent(agent: str) -> pd.DataFrame:
+    """
+    Merge first use dates with predictions for an agent.
+
+    Predictions are loaded first so only first use rows for predicted repos
+    are read.
+
+    Args:
+        agent: Agent name ('claude', 'copilot', or 'codex')
+
+    Returns:
+        DataFrame with columns MERGED_COLUMNS
+    """
+    predictions = load_predictions(agent)
+    first_use = load_first_use(agent, nwos=predictions["nwo"])
+    merged = first_use.merge(predictions, on="nwo", how="inner")
+    logger.info(f"Merged {len(merged)} repos with industry classifications")
+
+    return merged[MERGED_COLUMNS]
+
+
+def is_valid_merge(df: pd.DataFrame) -> bool:
+    """
+    Check that a cached frame has the layout merge_agent() produces.
+
+    Args:
+        df: Frame read from the merge cache
+
+    Returns:
+        True if the columns and the predicted_naics categories match
+    """
+    if list(df.columns) != MERGED_COLUMNS:
+        return False
+
+    # CategoricalDtype equality ignores category order, so compare the
+    # categories themselves
+    dtype = df["predicted_naics"].dtype
+    return (
+        isinstance(dtype, pd.CategoricalDtype)
+        and dtype.categories.equals(NAICS_DTYPE.categories)
+    )
+
+
+def load_merged(agent: str) -> pd.DataFrame:
+    """
+    Get the merged frame for an agent, reusing an Arrow IPC cache.
+
+    The merge is stored under data/_cache/ and shared by all scripts. It is
+    rebuilt when either source parquet file is newer than the cache, or when
+    the cached frame does not have the expected layout.
+
+    Args:
+        agent: Agent name ('claude', 'copilot', or 'codex')
+
+    Returns:
+        DataFrame with columns MERGED_COLUMNS
+    """
+    cache = CACHE_DIR / f"{agent}_merged_v{MERGE_CACHE_VERSION}.feather"
+    sources = [
+        PREDICTIONS_DIR / f"{agent}_predictions.parquet",
+        ADOPTION_DIR / f"{agent}_first_use.parquet",
+    ]
+    if cache.exists() and cache.stat().st_mtime > max(p.stat().st_mtime for p in sources):
+        merged = pd.read_feather(cache)
+        if is_valid_merge(merged):
+            logger.info(f"Loaded {len(merged)} merged {agent} repos from {cache}")
+            return merged
+        logger.warning(f"Rebuilding {cache}: columns or dtypes do not match")
+
+    merged = merge_agent(agent).reset_index(drop=True)
+
+    # Write then rename so a concurrent run never reads a partial file
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+    merged.to_feather(tmp, compression="uncompressed")
+    tmp.replace(cache)
+    return merged